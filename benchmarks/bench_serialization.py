@@ -0,0 +1,60 @@
+"""
+Serialization Microbenchmark
+Compares the old list response path (convert_objectid + jsonable_encoder + json)
+with MongoJSONResponse on a 10k-document payload
+
+Run from the repo root: python benchmarks/bench_serialization.py [n_docs]
+"""
+import sys
+import json
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from main import convert_objectid, MongoJSONResponse, orjson
+
+def make_documents(n):
+    start = datetime(2024, 11, 29)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": f"user_{i % 50}",
+            "emotion_score": i % 11,
+            "timestamp": start + timedelta(seconds=i),
+            "weather": "sunny",
+            "location": {"latitude": 25.0 + i * 1e-5, "longitude": 121.5, "address": "Taipei"}
+        }
+        for i in range(n)
+    ]
+
+def old_path(documents):
+    documents = [convert_objectid(item) for item in documents]
+    return json.dumps(jsonable_encoder(documents)).encode("utf-8")
+
+def new_path(documents):
+    return MongoJSONResponse(documents).body
+
+def best_of(fn, documents, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(documents)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+if __name__ == "__main__":
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    documents = make_documents(n_docs)
+
+    assert json.loads(old_path(documents)) == json.loads(new_path(documents))
+
+    old = best_of(old_path, documents, 5)
+    new = best_of(new_path, documents, 5)
+    print(f"📊 {n_docs} documents (orjson: {'yes' if orjson else 'no'})")
+    print(f"   convert_objectid + jsonable_encoder: {old * 1000:.1f} ms")
+    print(f"   MongoJSONResponse:                   {new * 1000:.1f} ms")
+    print(f"🚀 Speedup: {old / new:.1f}x")
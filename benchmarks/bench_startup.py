@@ -0,0 +1,130 @@
+"""
+Startup Benchmark
+Measures how long the app takes to become useful:
+  import     fresh-interpreter `import main` time (median of --repeat runs)
+  live       process start -> /health/live answers (serve.py, one worker)
+  ready      process start -> /health/ready answers 200 (MongoDB warmed up)
+With --url it instead times the first request to a deployed service (a Render cold
+start when the instance was idle) against an immediate second, warm request
+
+Run from the repo root (uses MONGODB_URI from the environment):
+  python benchmarks/bench_startup.py --repeat 5
+  python benchmarks/bench_startup.py --url https://emogo-backend-rafa-612.onrender.com
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def import_time() -> float:
+    """Seconds for `import main` in a fresh interpreter"""
+    code = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(completed.stdout.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(client: httpx.Client, url: str, started: float, timeout: float):
+    """Seconds since `started` until url answers 200, None on timeout"""
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+def server_startup(timeout: float) -> dict:
+    """Start serve.py with one worker and time the health probes"""
+    port = free_port()
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1", "WEB_CONCURRENCY": "1", "LOG_LEVEL": "WARNING"}
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "serve.py"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=2) as client:
+            live = wait_for(client, "/health/live", started, timeout)
+            ready = wait_for(client, "/health/ready", started, timeout) if live is not None else None
+    finally:
+        process.terminate()
+        _, stderr = process.communicate(timeout=30)
+    if live is None:
+        sys.exit(f"❌ Server did not come up within {timeout}s:\n{stderr.decode(errors='replace')[-2000:]}")
+    return {"live": live, "ready": ready}
+
+def remote_cold_start(url: str, timeout: float) -> dict:
+    """First request (possibly waking the instance) vs the next one"""
+    with httpx.Client(base_url=url, timeout=timeout) as client:
+        started = time.perf_counter()
+        first = client.get("/health/live")
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        client.get("/health/live")
+        warm = time.perf_counter() - started
+        started = time.perf_counter()
+        ready = client.get("/health/ready")
+        ready_time = time.perf_counter() - started
+    return {
+        "first_request_ms": round(cold * 1000, 1),
+        "warm_request_ms": round(warm * 1000, 1),
+        "ready_ms": round(ready_time * 1000, 1),
+        "status": [first.status_code, ready.status_code]
+    }
+
+def milliseconds(values: list) -> dict:
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"median_ms": None, "min_ms": None, "max_ms": None}
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EmoGo startup benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for the server to answer")
+    parser.add_argument("--url", help="Time a cold start of a deployed service instead")
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/startup_<time>.json)")
+    args = parser.parse_args()
+
+    report = {"recorded_at": datetime.utcnow().isoformat(), "python": platform.python_version()}
+    if args.url:
+        report["target"] = args.url
+        report["remote"] = remote_cold_start(args.url, args.timeout)
+        print(f"🌐 {args.url}")
+        print(f"   first request {report['remote']['first_request_ms']} ms, warm {report['remote']['warm_request_ms']} ms, "
+              f"ready {report['remote']['ready_ms']} ms (status {report['remote']['status']})")
+    else:
+        imports = [import_time() for _ in range(args.repeat)]
+        runs = [server_startup(args.timeout) for _ in range(args.repeat)]
+        report["target"] = "local"
+        report["import"] = milliseconds(imports)
+        report["live"] = milliseconds([run["live"] for run in runs])
+        report["ready"] = milliseconds([run["ready"] for run in runs])
+        print(f"🚀 Startup over {args.repeat} runs (median / min / max ms)")
+        for phase in ("import", "live", "ready"):
+            stats = report[phase]
+            print(f"   {phase:<7} {stats['median_ms']} / {stats['min_ms']} / {stats['max_ms']}")
+        if report["ready"]["median_ms"] is None:
+            print("⚠️ /health/ready never answered 200 (is MONGODB_URI reachable?)")
+
+    output = Path(args.output) if args.output else ROOT / "benchmarks" / "results" / f"startup_{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"📝 Results written to {output}")
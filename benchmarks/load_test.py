@@ -0,0 +1,328 @@
+"""
+Load Test
+Drives a weighted mix of /gps, /sentiments, /upload-video and the list endpoints at
+a fixed concurrency and reports throughput, p50/p95/p99 latency and peak RSS as JSON
+
+Targets:
+  --mongo memory                 in-process app on mongomock-motor (pip install mongomock-motor),
+                                 videos on the local storage backend; list_vlogs is left out of the
+                                 default mix (mongomock has no $convert for the fs.files join)
+  --mongo mongodb://host:27017   in-process app on a real mongod (database --db is dropped first)
+  --start-mongod                 spawn a throwaway local mongod for the run
+  --url http://host:8000         an already running server (RSS only with --server-pid)
+
+Run from the repo root:
+  python benchmarks/load_test.py --mongo memory --requests 5000 --concurrency 32
+  python benchmarks/load_test.py --start-mongod --compare benchmarks/results/<earlier>.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime, timedelta
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+
+# Operation name -> default weight in the request mix
+DEFAULT_MIX = {
+    "post_gps": 40,
+    "post_sentiment": 25,
+    "list_gps": 10,
+    "list_sentiments": 10,
+    "list_vlogs": 10,
+    "upload_video": 5,
+}
+# Operations mongomock can't serve; dropped from the default mix on --mongo memory
+MEMORY_UNSUPPORTED = {"list_vlogs"}
+
+def parse_mix(value: str) -> dict:
+    """"post_gps=50,list_gps=50" -> weights (unknown operations are rejected)"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}, choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+    return mix
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+class Workload:
+    """Builds requests for each operation; seeded so runs are reproducible"""
+
+    def __init__(self, seed: int, users: int, video_bytes: int):
+        self.random = random.Random(seed)
+        self.users = [f"bench_user_{i}" for i in range(users)]
+        self.video_bytes = video_bytes
+        self.start = datetime(2024, 11, 29)
+
+    def user(self) -> str:
+        return self.random.choice(self.users)
+
+    def timestamp(self) -> str:
+        return (self.start + timedelta(seconds=self.random.randrange(30 * 86400))).isoformat()
+
+    async def run(self, client: httpx.AsyncClient, operation: str) -> httpx.Response:
+        if operation == "post_gps":
+            return await client.post("/gps", json={
+                "user_id": self.user(),
+                "latitude": 25.0 + self.random.random() * 0.1,
+                "longitude": 121.5 + self.random.random() * 0.1,
+                "timestamp": self.timestamp()
+            })
+        if operation == "post_sentiment":
+            return await client.post("/sentiments", json={
+                "user_id": self.user(),
+                "emotion_score": self.random.randint(0, 10),
+                "timestamp": self.timestamp(),
+                "weather": self.random.choice(["sunny", "cloudy", "rainy"]),
+                "location": {"latitude": 25.03, "longitude": 121.56}
+            })
+        if operation in ("list_gps", "list_sentiments", "list_vlogs"):
+            collection = operation.split("_", 1)[1]
+            return await client.get(f"/{collection}", params={"user_id": self.user(), "limit": 100})
+        if operation == "upload_video":
+            # Random bytes, so uploads never hit content dedup
+            payload = self.random.randbytes(self.video_bytes)
+            user_id = self.user()
+            response = await client.post(
+                "/upload-video",
+                files={"file": ("bench.mp4", payload, "video/mp4")},
+                data={"user_id": user_id}
+            )
+            if response.status_code == 200:
+                await client.post("/vlogs", json={"user_id": user_id, "video_id": response.json()["video_id"]})
+            return response
+        raise ValueError(operation)
+
+async def drive(client: httpx.AsyncClient, workload: Workload, mix: dict, total: int, concurrency: int) -> dict:
+    """Run `total` requests from `concurrency` workers; returns per-operation latencies and errors"""
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    plan = workload.random.choices(operations, weights=weights, k=total)
+    latencies = {name: [] for name in operations}
+    errors = {name: 0 for name in operations}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(plan):
+            operation = plan[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await workload.run(client, operation)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[operation].append(time.perf_counter() - started)
+            else:
+                errors[operation] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"elapsed": time.perf_counter() - started, "latencies": latencies, "errors": errors}
+
+def start_mongod(port: int):
+    """Throwaway mongod on a temporary dbpath; returns (process, uri, dbpath)"""
+    mongod = shutil.which("mongod")
+    if not mongod:
+        sys.exit("❌ mongod not found on PATH (use --mongo memory or --mongo <uri>)")
+    dbpath = tempfile.mkdtemp(prefix="emogo_bench_db_")
+    process = subprocess.Popen(
+        [mongod, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return process, f"mongodb://127.0.0.1:{port}", dbpath
+
+async def wait_for_mongo(uri: str, timeout: float = 30):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=int(timeout * 1000))
+    try:
+        await client.admin.command("ping")
+    finally:
+        client.close()
+
+async def in_process_app(mongo: str, db_name: str, workdir: Path):
+    """Build an app against the chosen database and run its startup; returns (app, running lifespan)"""
+    os.chdir(workdir)  # uploads/ and storage directories are created relative to the cwd
+    os.environ.setdefault("TRANSCODE_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if mongo == "memory":
+        os.environ["VIDEO_STORAGE"] = "local"
+        os.environ.setdefault("ROLLUP_ENABLED", "false")  # mongomock lacks the bulk/aggregation features rollups need
+    import main
+
+    if mongo == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("❌ --mongo memory needs mongomock-motor (pip install mongomock-motor)")
+        main.AsyncIOMotorClient = lambda uri, **kwargs: AsyncMongoMockClient()
+        main.AsyncIOMotorGridFSBucket = lambda database: None  # Videos go to the local backend instead
+        main.MONGODB_URI = "mongodb://memory"
+    else:
+        main.MONGODB_URI = mongo
+        main.DB_NAME = db_name
+        await wait_for_mongo(mongo)
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo)
+        await client.drop_database(db_name)
+        client.close()
+    application = main.create_app()
+    lifespan = main.lifespan(application)
+    await lifespan.__aenter__()
+    return application, lifespan
+
+def peak_rss_mb(server_pid: int = None):
+    """Peak resident set size of this process, or of --server-pid (Linux /proc VmHWM)"""
+    if server_pid:
+        try:
+            for line in Path(f"/proc/{server_pid}/status").read_text().splitlines():
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            return None
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"📊 {report['target']} @ {report['git']}: {report['config']['requests']} requests, concurrency {report['config']['concurrency']}")
+    rows = [("total", report["total"])] + list(report["operations"].items())
+    for name, stats in rows:
+        line = (f"   {name:<16} {stats['throughput_rps']:>9.1f} req/s  p50 {stats['p50_ms']:>8.2f}  "
+                f"p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}")
+        previous = (baseline or {}).get("operations", {}).get(name) if name != "total" else (baseline or {}).get("total")
+        if previous and previous["throughput_rps"]:
+            change = (stats["throughput_rps"] / previous["throughput_rps"] - 1) * 100
+            line += f"  ({change:+.1f}% req/s, p95 {previous['p95_ms']:.2f} → {stats['p95_ms']:.2f} ms)"
+        print(line)
+    print(f"💾 Peak RSS: {report['peak_rss_mb']} MB")
+
+async def main_async(args):
+    mix = args.mix or DEFAULT_MIX
+    if not args.mix and not args.url and args.mongo == "memory" and not args.start_mongod:
+        mix = {name: weight for name, weight in mix.items() if name not in MEMORY_UNSUPPORTED}
+        print(f"ℹ️ Skipping {', '.join(sorted(MEMORY_UNSUPPORTED))} on --mongo memory (not supported by mongomock)", file=sys.stderr)
+    workload = Workload(args.seed, args.users, args.video_kb * 1024)
+    mongod = None
+    mongod_dbpath = None
+    application = None
+    workdir = Path(tempfile.mkdtemp(prefix="emogo_bench_"))
+    try:
+        if args.url:
+            target = args.url
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        else:
+            mongo = args.mongo
+            if args.start_mongod:
+                mongod, mongo, mongod_dbpath = start_mongod(args.mongod_port)
+            target = "memory" if mongo == "memory" else "mongod"
+            application, lifespan = await in_process_app(mongo, args.db, workdir)
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=application), base_url="http://bench", timeout=60)
+
+        async with client:
+            if args.warmup:
+                await drive(client, workload, mix, args.warmup, args.concurrency)
+            result = await drive(client, workload, mix, args.requests, args.concurrency)
+
+        all_latencies = [value for values in result["latencies"].values() for value in values]
+        report = {
+            "target": target,
+            "git": git_revision(),
+            "recorded_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "config": {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "warmup": args.warmup,
+                "mix": mix,
+                "users": args.users,
+                "video_kb": args.video_kb,
+                "seed": args.seed
+            },
+            "elapsed_seconds": round(result["elapsed"], 3),
+            "total": summarize(all_latencies, sum(result["errors"].values()), result["elapsed"]),
+            "operations": {
+                name: summarize(result["latencies"][name], result["errors"][name], result["elapsed"])
+                for name in mix
+            },
+            "peak_rss_mb": peak_rss_mb(args.server_pid) if args.url else peak_rss_mb()
+        }
+    finally:
+        if application is not None:
+            await lifespan.__aexit__(None, None, None)
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait(timeout=30)
+            shutil.rmtree(mongod_dbpath, ignore_errors=True)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = Path(args.output) if args.output else ROOT / "benchmarks" / "results" / f"load_{target if not args.url else 'url'}_{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    print(f"📝 Results written to {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EmoGo backend load test")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mongo", default="memory", help='"memory" or a MongoDB URI for the in-process app')
+    target.add_argument("--start-mongod", action="store_true", help="Run the in-process app on a throwaway local mongod")
+    target.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--mongod-port", type=int, default=27217)
+    parser.add_argument("--db", default="emogo_bench", help="Database used (and dropped) with a real mongod")
+    parser.add_argument("--server-pid", type=int, help="With --url: read the server's peak RSS from /proc")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=200, help="Requests sent before measuring")
+    parser.add_argument("--mix", type=parse_mix, help="Operation weights, e.g. post_gps=50,list_gps=50")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--video-kb", type=int, default=256, help="Payload size for upload_video")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/load_<target>_<time>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to diff against")
+    args = parser.parse_args()
+    # The in-process app runs from a temporary directory, so pin paths given relative to the caller
+    args.output = args.output and str(Path(args.output).resolve())
+    args.compare = args.compare and str(Path(args.compare).resolve())
+    asyncio.run(main_async(args))
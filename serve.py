@@ -0,0 +1,21 @@
+"""
+Production entry point: python serve.py
+Starts WEB_CONCURRENCY uvicorn worker processes on $PORT. Each worker opens its own
+Motor pool (MONGO_CONNECTION_BUDGET / WEB_CONCURRENCY connections by default), and
+one of them is elected to run the background jobs
+"""
+import os
+import uvicorn
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        proxy_headers=True,  # Render terminates TLS in front of the app
+        forwarded_allow_ips="*",
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "5")),
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30")),
+        access_log=os.getenv("ACCESS_LOG", "false").lower() == "true",  # Request metrics live at /metrics
+    )
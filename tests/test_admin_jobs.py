@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import main
+
+@pytest.fixture
+def blocking_job(app, monkeypatch):
+    """A "wait" job kind that runs until cancelled, with the admin_jobs indexes in place"""
+    async def wait_job(job):
+        await asyncio.Event().wait()
+    monkeypatch.setitem(main.ADMIN_JOBS, "wait", wait_job)
+    app.state.admin_tasks = set()
+
+    async def create_indexes():
+        for keys, options in [index if isinstance(index, tuple) else (index, {}) for index in main.INDEXES["admin_jobs"]]:
+            await app.state.mongodb["admin_jobs"].create_index(keys, **options)
+    return create_indexes
+
+def test_concurrent_starts_launch_one_job(app, blocking_job):
+    async def scenario():
+        await blocking_job()
+        results = await asyncio.gather(*(main.start_admin_job("wait", {}) for _ in range(2)), return_exceptions=True)
+        for task in app.state.admin_tasks:
+            task.cancel()
+        return results
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert [result.status_code for result in results if isinstance(result, HTTPException)] == [409]
+
+def test_cancelled_task_records_its_status(app, blocking_job):
+    async def scenario():
+        await blocking_job()
+        job_doc = await main.start_admin_job("wait", {})
+        await asyncio.sleep(0)
+        task = next(iter(app.state.admin_tasks))
+        task.cancel()
+        await asyncio.wait([task])
+        return task, await app.state.mongodb["admin_jobs"].find_one({"_id": job_doc["_id"]})
+
+    task, job = asyncio.run(scenario())
+    assert task.cancelled()
+    assert job["status"] == "cancelled"
+    assert job["finished_at"] is not None
+
+def test_stale_running_job_is_released(app, blocking_job):
+    stale = datetime.utcnow() - main.ADMIN_JOB_STALE - timedelta(minutes=1)
+
+    async def scenario():
+        await blocking_job()
+        await app.state.mongodb["admin_jobs"].insert_one({"kind": "wait", "status": "running", "heartbeat": stale, "errors": []})
+        job_doc = await main.start_admin_job("wait", {})
+        for task in app.state.admin_tasks:
+            task.cancel()
+        return job_doc, await app.state.mongodb["admin_jobs"].find_one({"heartbeat": stale})
+
+    job_doc, dead = asyncio.run(scenario())
+    assert job_doc["status"] == "running"
+    assert dead["status"] == "failed"
+
+def test_heartbeat_runs_between_progress_reports(app, blocking_job, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_JOB_HEARTBEAT_SECONDS", 0.01)
+
+    async def scenario():
+        await blocking_job()
+        job_doc = await main.start_admin_job("wait", {})
+        await asyncio.sleep(0.05)
+        job = await app.state.mongodb["admin_jobs"].find_one({"_id": job_doc["_id"]})
+        await app.state.mongodb["admin_jobs"].update_one({"_id": job_doc["_id"]}, {"$set": {"cancel_requested": True}})
+        await asyncio.wait(list(app.state.admin_tasks), timeout=1)
+        return job_doc, job, await app.state.mongodb["admin_jobs"].find_one({"_id": job_doc["_id"]})
+
+    job_doc, running, finished = asyncio.run(scenario())
+    assert running["heartbeat"] > job_doc["heartbeat"]
+    assert finished["status"] == "cancelled"
+    assert finished["errors"] == ["Cancel requested"]
+
+def test_finish_does_not_overwrite_a_record_taken_over(app, blocking_job, monkeypatch):
+    release = asyncio.Event()
+
+    async def scenario():
+        async def slow_job(job):
+            await release.wait()
+            return {"done": True}
+        monkeypatch.setitem(main.ADMIN_JOBS, "slow", slow_job)
+        job_doc = await main.start_admin_job("slow", {})
+        await app.state.mongodb["admin_jobs"].update_one({"_id": job_doc["_id"]}, {"$set": {"status": "failed"}})
+        release.set()
+        await asyncio.wait(list(app.state.admin_tasks), timeout=1)
+        return await app.state.mongodb["admin_jobs"].find_one({"_id": job_doc["_id"]})
+
+    assert asyncio.run(scenario())["status"] == "failed"
+
+def test_maintenance_endpoint_starts_a_job(app, blocking_job):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/admin/migrate-timestamps")
+        if app.state.admin_tasks:
+            await asyncio.wait(list(app.state.admin_tasks), timeout=1)
+        return response, await app.state.mongodb["admin_jobs"].find_one({})
+
+    response, job = asyncio.run(scenario())
+    assert response.status_code == 202
+    assert response.json()["_id"] == str(job["_id"])
+    assert job["kind"] == "migrate-timestamps"
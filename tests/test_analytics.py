@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+
+def get(app, path: str, **params):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+class AggregateCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length):
+        return self.rows
+
+class RecordingCollection:
+    """Stands in for pipelines using operators mongomock lacks ($dateTrunc, $round)"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return AggregateCursor(self.rows)
+
+def test_histogram_counts_per_score(app):
+    asyncio.run(app.state.mongodb["sentiments"].insert_many([
+        {"user_id": "u1", "emotion_score": score, "timestamp": datetime(2024, 5, 1)}
+        for score in (3, 1, 3, 5, 3)
+    ] + [{"user_id": "u2", "emotion_score": 1, "timestamp": datetime(2024, 5, 1)}]))
+    assert get(app, "/analytics/sentiments/histogram", user_id="u1").json() == {
+        "rows": 3, "score": [1, 3, 5], "count": [1, 3, 1]
+    }
+
+def test_trend_buckets_and_columnar_output(app):
+    sentiments = RecordingCollection([
+        {"user_id": "u1", "bucket": datetime(2024, 5, 1), "mean": 3.5, "min": 2, "max": 5, "count": 4},
+        {"user_id": "u1", "bucket": datetime(2024, 5, 2), "mean": 1.0, "min": 1, "max": 1, "count": 1},
+    ])
+    app.state.mongodb = {"sentiments": sentiments}
+    response = get(app, "/analytics/sentiments/trend", bucket="week", user_id="u1", since="2024-05-01T00:00:00")
+    assert response.status_code == 200
+    assert response.json() == {
+        "bucket_unit": "week",
+        "rows": 2,
+        "user_id": ["u1", "u1"],
+        "bucket": ["2024-05-01T00:00:00", "2024-05-02T00:00:00"],
+        "mean": [3.5, 1.0],
+        "min": [2, 1],
+        "max": [5, 1],
+        "count": [4, 1]
+    }
+    pipeline = sentiments.pipelines[0]
+    assert pipeline[0] == {"$match": {"user_id": "u1", "timestamp": {"$gte": datetime(2024, 5, 1)}}}
+    assert pipeline[1]["$group"]["_id"]["bucket"] == {"$dateTrunc": {"date": "$timestamp", "unit": "week"}}
+
+def test_trend_rejects_unknown_bucket(app):
+    assert get(app, "/analytics/sentiments/trend", bucket="year").status_code == 422
+
+def test_weather_groups_missing_values_as_unknown(app):
+    sentiments = RecordingCollection([{"weather": "unknown", "mean": 2.0, "min": 2, "max": 2, "count": 1}])
+    app.state.mongodb = {"sentiments": sentiments}
+    assert get(app, "/analytics/sentiments/weather").json() == {
+        "rows": 1, "weather": ["unknown"], "mean": [2.0], "min": [2], "max": [2], "count": [1]
+    }
+    assert sentiments.pipelines[0][1]["$group"]["_id"] == {"$ifNull": ["$weather", "unknown"]}
+
+def test_rollups_derive_the_mean(app):
+    asyncio.run(app.state.mongodb["rollups_daily"].insert_many([
+        {"user_id": "u1", "bucket": datetime(2024, 5, 2), "emotion_sum": 7, "emotion_count": 2, "emotion_min": 3, "emotion_max": 4, "distance_m": 1234.56},
+        {"user_id": "u1", "bucket": datetime(2024, 5, 1), "emotion_sum": 0, "emotion_count": 0, "gps_points": 5},
+    ]))
+    body = get(app, "/analytics/rollups", user_id="u1").json()
+    assert body["rows"] == 2
+    assert body["bucket"] == ["2024-05-01T00:00:00", "2024-05-02T00:00:00"]
+    assert body["emotion_mean"] == [None, 3.5]
+    assert body["gps_points"] == [5, 0]
+    assert body["distance_m"] == [0.0, 1234.6]
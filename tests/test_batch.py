@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+import main
+
+def post_batch(app, path: str, content: bytes, content_type: str = "application/x-ndjson"):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, content=content, headers={"Content-Type": content_type})
+    return asyncio.run(request())
+
+def test_items_get_results_in_order(app):
+    body = b'[{"user_id": "u1", "latitude": 25.03, "longitude": 121.56}, {"user_id": "u1"}]'
+    response = post_batch(app, "/gps/batch", body, "application/json")
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["status"], result["inserted"], result["failed"]) == ("partial", 1, 1)
+    assert [item["status"] for item in result["results"]] == ["success", "error"]
+    assert [item["index"] for item in result["results"]] == [0, 1]
+
+def test_malformed_ndjson_line_only_fails_its_slot(app):
+    body = b'{"user_id": "u1", "emotion_score": 3}\n{"user_id": "u1", \n\n{"user_id": "u2", "emotion_score": 4}\n'
+    result = post_batch(app, "/sentiments/batch", body).json()
+    assert [item["status"] for item in result["results"]] == ["success", "error", "success"]
+    assert "Invalid JSON line" in result["results"][1]["error"]
+
+    async def stored():
+        return await app.state.mongodb["sentiments"].count_documents({})
+    assert asyncio.run(stored()) == 2
+
+def test_oversized_body_is_413(app, monkeypatch):
+    monkeypatch.setattr(main, "MAX_BATCH_BYTES", 100)
+    body = b'{"user_id": "u1", "emotion_score": 3}\n' * 10
+    assert post_batch(app, "/sentiments/batch", body).status_code == 413
+
+    async def streamed():
+        yield body
+    assert post_batch(app, "/sentiments/batch", streamed()).status_code == 413
@@ -0,0 +1,60 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import httpx
+
+import main
+
+def get(app, path: str, **params):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+def seed(app):
+    async def insert():
+        db = app.state.mongodb
+        await db["sentiments"].insert_many([
+            {"user_id": "u1", "emotion_score": 4, "weather": "sunny", "timestamp": datetime(2024, 5, 1, 8)},
+            {"user_id": "u2", "emotion_score": 2, "weather": "rain", "timestamp": datetime(2024, 5, 1, 9)},
+        ])
+        await db["gps"].insert_one({"user_id": "u1", "latitude": 25.0, "longitude": 121.5, "timestamp": datetime(2024, 5, 1, 10)})
+    asyncio.run(insert())
+
+def test_ndjson_has_one_tagged_record_per_line(app):
+    seed(app)
+    response = get(app, "/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"].endswith('.ndjson"')
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["collection"] for record in records] == ["sentiments", "sentiments", "gps"]
+    assert all(isinstance(record["_id"], str) for record in records)
+    assert records[0]["timestamp"] == "2024-05-01T08:00:00"
+
+def test_csv_header_and_filters(app):
+    seed(app)
+    response = get(app, "/export", format="csv", user_id="u1", collections="sentiments,gps")
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == main.EXPORT_CSV_COLUMNS
+    assert [(row["collection"], row["user_id"]) for row in rows] == [("sentiments", "u1"), ("gps", "u1")]
+    assert rows[0]["emotion_score"] == "4" and rows[0]["latitude"] == ""
+    assert rows[1]["latitude"] == "25.0"
+
+def test_gzip_stream_decompresses_to_the_plain_export(app, monkeypatch):
+    monkeypatch.setattr(main, "EXPORT_FLUSH_BYTES", 16)  # Exercise several compressed pieces
+    seed(app)
+    plain = get(app, "/export", collections="sentiments").content
+    response = get(app, "/export", collections="sentiments", gzip="true")
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+    assert gzip.decompress(response.content) == plain
+
+def test_unknown_collection_is_400(app):
+    assert get(app, "/export", collections="sentiments,secrets").status_code == 400
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+
+def get(app, path: str, **params):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.limited = None
+
+    def limit(self, count):
+        self.limited = count
+        return self
+
+    async def to_list(self, length):
+        return self.rows
+
+class GeoCollection:
+    """Records the queries; mongomock has no $geoWithin or $geoNear"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.pipelines = []
+        self.cursor = None
+
+    def find(self, query):
+        self.queries.append(query)
+        self.cursor = Cursor(self.rows)
+        return self.cursor
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return Cursor(self.rows)
+
+def test_bbox_queries_a_closed_polygon(app):
+    gps = GeoCollection([{"_id": "p1", "user_id": "u1"}])
+    app.state.mongodb = {"gps": gps}
+    response = get(app, "/geo/gps/bbox", min_lat=25.0, min_lon=121.0, max_lat=25.1, max_lon=121.2, user_id="u1", limit=5)
+    assert response.status_code == 200
+    assert response.json() == [{"_id": "p1", "user_id": "u1"}]
+    assert gps.queries == [{
+        "user_id": "u1",
+        "geo": {"$geoWithin": {"$geometry": {
+            "type": "Polygon",
+            "coordinates": [[[121.0, 25.0], [121.2, 25.0], [121.2, 25.1], [121.0, 25.1], [121.0, 25.0]]]
+        }}}
+    }]
+    assert gps.cursor.limited == 5
+
+def test_near_uses_geo_near_with_lon_lat_order(app):
+    vlogs = GeoCollection([{"_id": "v1", "distance_m": 12.5}])
+    app.state.mongodb = {"vlogs": vlogs}
+    response = get(app, "/geo/vlogs/near", lat=25.0, lon=121.5, radius_m=250, limit=3)
+    assert response.json() == [{"_id": "v1", "distance_m": 12.5}]
+    geo_near, limit = vlogs.pipelines[0]
+    assert geo_near["$geoNear"]["near"] == {"type": "Point", "coordinates": [121.5, 25.0]}
+    assert geo_near["$geoNear"]["maxDistance"] == 250
+    assert geo_near["$geoNear"]["distanceField"] == "distance_m"
+    assert limit == {"$limit": 3}
+
+def test_heatmap_groups_sentiment_cells(app):
+    sentiments = GeoCollection([{"lat": 25.03, "lon": 121.56, "count": 4, "emotion_mean": 3.5}])
+    app.state.mongodb = {"sentiments": sentiments}
+    body = get(app, "/geo/sentiments/heatmap", cell_deg=0.01).json()
+    assert body == {"cell_deg": 0.01, "rows": 1, "lat": [25.03], "lon": [121.56], "count": [4], "emotion_mean": [3.5]}
+    match, group = sentiments.pipelines[0][:2]
+    assert match == {"$match": {"geo": {"$exists": True}}}
+    assert group["$group"]["emotion_mean"] == {"$avg": "$emotion_score"}
+
+def test_validation(app):
+    assert get(app, "/geo/secrets/bbox", min_lat=0, min_lon=0, max_lat=1, max_lon=1).status_code == 404
+    assert get(app, "/geo/gps/bbox", min_lat=1, min_lon=0, max_lat=1, max_lon=1).status_code == 400
+    assert get(app, "/geo/gps/heatmap", min_lat=0, max_lat=1).status_code == 400
+    assert get(app, "/geo/gps/near", lat=91, lon=0).status_code == 422
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+
+import main
+
+HOUR = datetime(2024, 5, 1, 8)
+
+def raw_points(count: int, start: datetime = HOUR) -> list:
+    return [
+        {"user_id": "u1", "timestamp": start + timedelta(minutes=minute), "latitude": 25.0 + minute / 1e4, "longitude": 121.5}
+        for minute in range(count)
+    ]
+
+def track_bucket(points: list) -> dict:
+    t_ms = np.array([main.to_epoch_ms(point["timestamp"]) for point in points], dtype=np.int64)
+    bucket = main.encode_track(t_ms, np.array([point["latitude"] for point in points]), np.array([point["longitude"] for point in points]))
+    bucket.update({"user_id": "u1", "hour": HOUR, "start": points[0]["timestamp"], "end": points[-1]["timestamp"]})
+    return bucket
+
+def load(app, raw: list, buckets: list):
+    async def scenario():
+        if raw:
+            await app.state.mongodb["gps"].insert_many(raw)
+        if buckets:
+            await app.state.mongodb["gps_tracks"].insert_many(buckets)
+        return await main.load_track("u1", None, None)
+    return asyncio.run(scenario())
+
+def test_compacted_hour_is_not_read_twice(app):
+    points = raw_points(5)
+    t_ms, _, _ = load(app, points, [track_bucket(points)])
+    assert len(t_ms) == 5
+
+def test_bucket_outlives_trimmed_raw_points(app):
+    points = raw_points(5)
+    t_ms, latitude, _ = load(app, points[3:], [track_bucket(points)])
+    assert len(t_ms) == 5
+    assert np.allclose(latitude, [point["latitude"] for point in points])
+
+def test_late_points_win_over_a_stale_bucket(app):
+    points = raw_points(6)
+    t_ms, _, _ = load(app, points, [track_bucket(points[:4])])
+    assert len(t_ms) == 6
+
+def test_encode_decode_round_trip():
+    t_ms = np.array([1714550400000, 1714550401000, 1714550403500, 1714550460000], dtype=np.int64)
+    latitude = np.array([25.0330, 25.0331234, 25.0329876, 25.1])
+    longitude = np.array([121.5654, 121.5655, 121.5660001, 121.4])
+    decoded_t, decoded_lat, decoded_lon = main.decode_track(main.encode_track(t_ms, latitude, longitude))
+    assert decoded_t.tolist() == t_ms.tolist()
+    assert np.allclose(decoded_lat, latitude, atol=1e-7)
+    assert np.allclose(decoded_lon, longitude, atol=1e-7)
+
+def test_douglas_peucker_keeps_only_the_corner_of_an_l():
+    x = np.array([0.0, 1.0, 2.0, 3.0, 3.0, 3.0, 3.0])
+    y = np.array([0.0, 0.001, 0.0, 0.0, 1.0, 2.0, 3.0])
+    assert main.douglas_peucker(x, y, 0.01).tolist() == [True, False, False, True, False, False, True]
+    # Zero tolerance keeps every point off a straight run, but still drops collinear ones
+    assert main.douglas_peucker(x, y, 0).tolist() == [True, True, True, True, False, False, True]
+    assert main.douglas_peucker(x[:2], y[:2], 1.0).tolist() == [True, True]
+
+def test_compaction_resumes_from_its_watermark(app):
+    old = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+
+    async def scenario():
+        gps = app.state.mongodb["gps"]
+        await gps.insert_many(raw_points(3, old) + raw_points(2, old + timedelta(hours=5)))
+        first = await main.compact_gps_job(main.AdminJob(ObjectId()))
+        second = await main.compact_gps_job(main.AdminJob(ObjectId()))
+        # Past the first runs' cutoff, so only a later cutoff reaches it
+        await gps.insert_many(raw_points(4, old + timedelta(hours=60)))
+        third = await main.compact_gps_job(main.AdminJob(ObjectId()), older_than_hours=1)
+        buckets = await app.state.mongodb["gps_tracks"].find({}, {"hour": 1, "count": 1}).sort("hour", 1).to_list(None)
+        return first, second, third, buckets
+
+    first, second, third, buckets = asyncio.run(scenario())
+    assert (first["buckets"], first["points"]) == (2, 5)
+    assert (second["buckets"], third["buckets"], third["points"]) == (0, 1, 4)
+    assert [(bucket["hour"], bucket["count"]) for bucket in buckets] == [
+        (old, 3), (old + timedelta(hours=5), 2), (old + timedelta(hours=60), 4)
+    ]
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+import main
+
+def test_dumps_bson_encodes_nested_object_ids_and_datetimes():
+    video_id = ObjectId()
+    document = {
+        "_id": video_id,
+        "timestamp": datetime(2024, 5, 1, 8, 30),
+        "location": {"points": [{"ref": video_id}]},
+        "emotion_score": 3
+    }
+    assert json.loads(main.dumps_bson(document)) == {
+        "_id": str(video_id),
+        "timestamp": "2024-05-01T08:30:00",
+        "location": {"points": [{"ref": str(video_id)}]},
+        "emotion_score": 3
+    }
+
+def test_stdlib_fallback_matches(monkeypatch):
+    video_id = ObjectId()
+    document = [{"_id": video_id, "timestamp": datetime(2024, 5, 1), "note": "café"}]
+    expected = json.loads(main.dumps_bson(document))
+    monkeypatch.setattr(main, "orjson", None)
+    body = main.dumps_bson(document)
+    assert "café" in body.decode("utf-8")
+    assert json.loads(body) == expected
+
+def test_mongo_json_response_renders_raw_documents():
+    video_id = ObjectId()
+    response = main.MongoJSONResponse([{"_id": video_id, "timestamp": datetime(2024, 5, 1)}])
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == [{"_id": str(video_id), "timestamp": "2024-05-01T00:00:00"}]
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+from bson import ObjectId
+
+import main
+
+def parse_event(message: bytes) -> tuple:
+    """(event name, decoded data) of one SSE message"""
+    fields = dict(line.split(": ", 1) for line in message.decode("utf-8").strip().split("\n") if ": " in line)
+    return fields["event"], json.loads(fields["data"])
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+def test_subscribers_only_get_matching_inserts(app):
+    async def scenario():
+        feed = main.LiveFeed(queue_size=8)
+        everyone = feed.subscribe(None, ["sentiments", "gps"])
+        just_u1 = feed.subscribe("u1", ["sentiments"])
+        document_id = ObjectId()
+        feed.publish_local("sentiments", [{"_id": document_id, "user_id": "u1", "emotion_score": 4}, {"user_id": "u2"}])
+        feed.publish_local("vlogs", [{"user_id": "u1"}])
+        events = [[subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())] for subscriber in (everyone, just_u1)]
+        feed.unsubscribe(everyone)
+        feed.unsubscribe(just_u1)
+        return document_id, events
+
+    document_id, (everyone, just_u1) = asyncio.run(scenario())
+    assert len(everyone) == 2
+    assert just_u1 == [everyone[0]]
+    assert just_u1[0] == (
+        f"event: sentiments\nid: {document_id}\n".encode()
+        + f'data: {{"_id":"{document_id}","user_id":"u1","emotion_score":4}}\n\n'.encode()
+    )
+
+def test_full_queue_drops_instead_of_blocking(app):
+    async def scenario():
+        feed = main.LiveFeed(queue_size=2)
+        subscriber = feed.subscribe(None, ["gps"])
+        feed.publish("gps", [{"user_id": "u1", "n": index} for index in range(5)])
+        queued = subscriber.queue.qsize()
+        feed.unsubscribe(subscriber)
+        return queued, subscriber.dropped, feed.subscribers, feed._watcher
+
+    queued, dropped, subscribers, watcher = asyncio.run(scenario())
+    assert (queued, dropped) == (2, 3)
+    assert not subscribers and watcher is None
+
+def test_stream_delivers_inserts_and_reports_drops(app):
+    app.state.live_feed = main.LiveFeed(queue_size=1)
+
+    async def scenario():
+        response = await main.stream(ConnectedRequest(), user_id="u1", collections="sentiments")
+        body = response.body_iterator
+        messages = [await body.__anext__()]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for score in (1, 2):
+                assert (await client.post("/sentiments", json={"user_id": "u1", "emotion_score": score})).status_code == 200
+            await client.post("/sentiments", json={"user_id": "u2", "emotion_score": 9})
+        messages.append(await body.__anext__())
+        messages.append(await body.__anext__())
+        await body.aclose()
+        return response, messages
+
+    response, (ready, dropped, event) = asyncio.run(scenario())
+    assert response.media_type == "text/event-stream"
+    assert ready.startswith(b"retry: 3000\n")
+    assert parse_event(ready[len(b"retry: 3000\n"):]) == ("ready", {"user_id": "u1", "collections": ["sentiments"]})
+    # The one-slot queue kept the first insert and dropped the second
+    assert parse_event(dropped) == ("dropped", {"count": 1})
+    name, document = parse_event(event)
+    assert name == "sentiments" and document["emotion_score"] == 1
+    assert not app.state.live_feed.subscribers
+
+def test_stream_validates_collections(app):
+    async def request(path):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+    assert asyncio.run(request("/stream?collections=secrets")).status_code == 400
+    assert asyncio.run(request("/stream?collections=")).status_code == 400
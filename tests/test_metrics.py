@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import httpx
+
+import main
+
+def get(app, *paths: str):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for path in paths]
+    return asyncio.run(request())
+
+def sample(text: str, series: str) -> float:
+    """Value of one exposition line, 0 when the series hasn't been seen yet"""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+def test_requests_are_counted_by_route_template(app):
+    pid = os.getpid()
+    requests = f'emogo_http_requests_total{{pid="{pid}",method="GET",route="/gps",status="200"}}'
+    not_found = f'emogo_http_requests_total{{pid="{pid}",method="GET",route="/download-video/{{video_id}}",status="404"}}'
+    latency = f'emogo_http_request_duration_seconds_count{{pid="{pid}",method="GET",route="/gps"}}'
+    before = get(app, "/metrics")[0].text
+
+    *_, response = get(app, "/gps", "/gps", f"/download-video/{'0' * 24}", "/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE emogo_http_requests_total counter" in response.text
+    assert sample(response.text, requests) - sample(before, requests) == 2
+    assert sample(response.text, not_found) - sample(before, not_found) == 1
+    assert sample(response.text, latency) - sample(before, latency) == 2
+    # Nothing is in flight once the responses are done
+    assert sample(response.text, f'emogo_http_requests_in_flight{{pid="{pid}",method="GET",route="/gps"}}') == 0
+
+def test_disabled_metrics_are_404(app, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_ENABLED", False)
+    assert get(app, "/metrics")[0].status_code == 404
@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+def get(app, path: str, **params):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(request())
+
+def seed(app, documents: list):
+    asyncio.run(app.state.mongodb["sentiments"].insert_many(documents))
+
+def test_cursor_walks_a_users_records_in_id_order(app):
+    start = datetime(2024, 5, 1)
+    seed(app, [
+        {"user_id": "u1" if index % 3 else "u2", "emotion_score": index, "timestamp": start + timedelta(minutes=index)}
+        for index in range(9)
+    ])
+    pages, params = [], {"user_id": "u1", "limit": 2}
+    while True:
+        response = get(app, "/sentiments", **params)
+        assert response.status_code == 200
+        pages.append([document["emotion_score"] for document in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+    assert pages == [[1, 2], [4, 5], [7, 8]]
+
+def test_time_range_and_fields(app):
+    start = datetime(2024, 5, 1)
+    seed(app, [{"user_id": "u1", "emotion_score": index, "weather": "sunny", "timestamp": start + timedelta(hours=index)} for index in range(4)])
+    response = get(app, "/sentiments", since=(start + timedelta(hours=1)).isoformat(), until=(start + timedelta(hours=2)).isoformat(), fields="emotion_score")
+    assert [set(document) for document in response.json()] == [{"_id", "emotion_score"}] * 2
+    assert "X-Next-Cursor" not in response.headers
+
+def test_invalid_cursor_is_400(app):
+    assert get(app, "/gps", after="not-a-cursor").status_code == 400
@@ -0,0 +1,31 @@
+import main
+
+def explain(winning_plan: dict, docs_examined: int = 0, returned: int = 0) -> dict:
+    return {
+        "queryPlanner": {"winningPlan": winning_plan},
+        "executionStats": {"totalDocsExamined": docs_examined, "totalKeysExamined": docs_examined, "nReturned": returned}
+    }
+
+def test_filter_served_by_its_index_is_indexed():
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {
+        "stage": "IXSCAN", "indexName": "user_id_1_timestamp_1", "keyPattern": {"user_id": 1, "timestamp": 1}
+    }}}}
+    summary = main.summarize_plan(explain(plan), "user_id")
+    assert summary["indexed"] is True
+    assert summary["indexes"] == ["user_id:1, timestamp:1"]
+    assert summary["stages"] == ["LIMIT", "SORT", "FETCH", "IXSCAN"]
+
+def test_id_index_scan_with_filter_is_a_regression():
+    # What the planner picks for find({"user_id": ...}).sort("_id") once the user_id index is gone
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "filter": {"user_id": {"$eq": "x"}}, "inputStage": {
+        "stage": "IXSCAN", "indexName": "_id_", "keyPattern": {"_id": 1}
+    }}}
+    summary = main.summarize_plan(explain(plan, docs_examined=50000), "user_id")
+    assert "COLLSCAN" not in summary["stages"]
+    assert summary["indexed"] is False
+    assert summary["docs_examined"] == 50000
+
+def test_unfiltered_probe_has_no_expectation():
+    summary = main.summarize_plan(explain({"stage": "COLLSCAN"}, docs_examined=10, returned=10), None)
+    assert "indexed" not in summary
+    assert summary["returned"] == 10
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import HTTPException
+
+from main import parse_range_header
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+@pytest.mark.parametrize("header", [None, "", "items=0-1", "bytes=0-1,5-9", "bytes=a-b", "bytes=-0", "bytes=50-10"])
+def test_ignored_headers_serve_the_full_body(header):
+    assert parse_range_header(header, 1000) is None
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1200"])
+def test_unsatisfiable_ranges_are_416(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range_header(header, 1000)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */1000"
@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+
+import main
+
+SENTIMENT = {"user_id": "u1", "emotion_score": 5}
+
+def second_worker(app):
+    """Another app on the same database, as a second uvicorn worker would be"""
+    other = main.create_app()
+    other.state.mongodb_client = app.state.mongodb_client
+    other.state.mongodb = app.state.mongodb
+    other.state.write_buffers = {}
+    return other
+
+async def request(app, method: str, path: str, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+def test_unchanged_poll_is_304_until_a_write(app):
+    async def scenario():
+        first = await request(app, "GET", "/sentiments")
+        etag = first.headers["ETag"]
+        unchanged = await request(app, "GET", "/sentiments", headers={"If-None-Match": etag})
+        await request(app, "POST", "/sentiments", json=SENTIMENT)
+        changed = await request(app, "GET", "/sentiments", headers={"If-None-Match": etag})
+        return first, unchanged, changed
+
+    first, unchanged, changed = asyncio.run(scenario())
+    assert first.headers["X-Cache"] == "MISS"
+    assert (unchanged.status_code, unchanged.headers["X-Cache"]) == (304, "HIT")
+    assert changed.status_code == 200
+    assert len(changed.json()) == 1
+
+def test_write_on_one_worker_expires_the_others_cache(app):
+    other = second_worker(app)
+    app.state.response_cache.shared = other.state.response_cache.shared = True
+
+    async def scenario():
+        await request(other, "GET", "/sentiments")
+        cached = await request(other, "GET", "/sentiments")
+        await request(app, "POST", "/sentiments", json=SENTIMENT)
+        after_write = await request(other, "GET", "/sentiments")
+        return cached, after_write
+
+    cached, after_write = asyncio.run(scenario())
+    assert cached.headers["X-Cache"] == "HIT"
+    assert after_write.headers["X-Cache"] == "MISS"
+    assert len(after_write.json()) == 1
+
+def test_unshared_cache_needs_no_database_round_trip(app):
+    assert asyncio.run(app.state.response_cache.shared_generation({"gps"})) == ()
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+import main
+
+def test_source_batch_skips_ids_inside_the_safety_lag(app):
+    settled_id = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(minutes=5))
+    fresh_id = ObjectId()
+
+    async def scenario():
+        await app.state.mongodb["gps"].insert_many([{"_id": fresh_id}, {"_id": settled_id}])
+        return await main.rollup_source_batch("gps", {"_id": 1})
+
+    assert [document["_id"] for document in asyncio.run(scenario())] == [settled_id]
+
+def test_source_batch_resumes_after_high_water_mark(app):
+    base = datetime.now(timezone.utc) - timedelta(minutes=5)
+    ids = [ObjectId.from_datetime(base + timedelta(seconds=second)) for second in range(3)]
+
+    async def scenario():
+        await app.state.mongodb["sentiments"].insert_many([{"_id": object_id} for object_id in ids])
+        await app.state.mongodb["rollup_state"].insert_one({"_id": "sentiments", "last_id": ids[0]})
+        return await main.rollup_source_batch("sentiments", {"_id": 1})
+
+    assert [document["_id"] for document in asyncio.run(scenario())] == ids[1:]
+
+def test_batch_replayed_after_a_lost_mark_is_not_counted_twice(app):
+    base = datetime.now(timezone.utc) - timedelta(minutes=5)
+    hour = datetime(2024, 5, 1, 8)
+    sentiments = [
+        {"_id": ObjectId.from_datetime(base + timedelta(seconds=second)), "user_id": "u1", "timestamp": hour, "emotion_score": score}
+        for second, score in enumerate([2, 4])
+    ]
+    points = [
+        {"_id": ObjectId.from_datetime(base + timedelta(seconds=second)), "user_id": "u1", "timestamp": hour, "latitude": 25.0 + second / 1000, "longitude": 121.5}
+        for second in range(3)
+    ]
+
+    async def scenario():
+        db = app.state.mongodb
+        await db["sentiments"].insert_many(sentiments[:1])
+        await db["gps"].insert_many(points[:2])
+        await main.refresh_sentiment_rollups()
+        await main.refresh_gps_rollups()
+        # Crash before the high-water marks were saved: the next pass re-reads the same batch
+        await db["rollup_state"].delete_many({})
+        await db["sentiments"].insert_many(sentiments[1:])
+        await db["gps"].insert_many(points[2:])
+        await main.refresh_sentiment_rollups()
+        await main.refresh_gps_rollups()
+        return await db["rollups_hourly"].find_one({"user_id": "u1"})
+
+    rollup = asyncio.run(scenario())
+    assert (rollup["emotion_sum"], rollup["emotion_count"]) == (6, 2)
+    assert rollup["gps_points"] == 3
+    assert round(rollup["distance_m"]) == round(2 * main.haversine_m(25.0, 121.5, 25.001, 121.5))
@@ -0,0 +1,133 @@
+import asyncio
+import io
+
+import pytest
+from bson import ObjectId
+
+import main
+
+async def chunked(data: bytes, size: int = 1000):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+async def read_range(backend, file_doc: dict, start: int, end: int) -> bytes:
+    return b"".join([chunk async for chunk in backend.iter_range(file_doc, start, end)])
+
+class FakeS3Client:
+    """The subset of the boto3 S3 client the backend calls, over a dict of objects"""
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.calls.append("put_object")
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append("create_multipart_upload")
+        self.uploads["upload-1"] = {}
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(value) for value in Range.removeprefix("bytes=").split("-"))
+        return {"Body": io.BytesIO(self.objects[Key][start:end + 1])}
+
+    def delete_object(self, Bucket, Key):
+        del self.objects[Key]
+
+@pytest.fixture
+def s3_storage(monkeypatch, local_storage):
+    """An S3Storage backed by FakeS3Client, registered alongside the local backend"""
+    monkeypatch.setattr(main, "S3_BUCKET", "emogo-test")
+    monkeypatch.setattr(main, "S3_PART_SIZE", 4096)
+    backend = object.__new__(main.S3Storage)
+    backend.client = FakeS3Client()
+    main._storage_backends["s3"] = backend
+    return backend
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+def test_local_write_and_ranges(app, local_storage):
+    async def scenario():
+        file_id, size, _ = await main.write_video("clip.mp4", chunked(DATA), {"user_id": "u1"})
+        file_doc = await app.state.mongodb["fs.files"].find_one({"_id": file_id})
+        backend = main.storage_for(file_doc)
+        return size, backend, file_doc, [
+            await read_range(backend, file_doc, 0, size - 1),
+            await read_range(backend, file_doc, 100, 199),
+            await read_range(backend, file_doc, size - 10, size + 50),
+        ]
+
+    size, backend, file_doc, ranges = asyncio.run(scenario())
+    assert size == len(DATA)
+    assert isinstance(backend, main.LocalStorage)
+    assert backend.local_path(file_doc).read_bytes() == DATA
+    assert ranges == [DATA, DATA[100:200], DATA[-10:]]
+    assert not list(local_storage.rglob("*.part"))
+
+def test_s3_multipart_write_and_ranges(app, s3_storage, monkeypatch):
+    monkeypatch.setattr(main, "VIDEO_STORAGE", "s3")
+
+    async def scenario():
+        file_id, _, _ = await main.write_video("clip.mp4", chunked(DATA), {"user_id": "u1"})
+        file_doc = await app.state.mongodb["fs.files"].find_one({"_id": file_id})
+        return file_doc, [
+            await read_range(s3_storage, file_doc, 0, len(DATA) - 1),
+            await read_range(s3_storage, file_doc, 5000, 5099),
+            await read_range(s3_storage, file_doc, 10, 9),
+        ]
+
+    file_doc, ranges = asyncio.run(scenario())
+    assert file_doc["metadata"]["storage"] == "s3"
+    assert file_doc["metadata"]["storage_key"] == f"videos/{file_doc['_id']}.mp4"
+    assert s3_storage.client.calls == ["create_multipart_upload"]
+    assert ranges == [DATA, DATA[5000:5100], b""]
+
+def test_small_s3_object_is_a_single_put(app, s3_storage):
+    asyncio.run(s3_storage.write_object("videos/small.mp4", chunked(b"tiny"), "video/mp4"))
+    assert s3_storage.client.calls == ["put_object"]
+    assert s3_storage.client.objects["videos/small.mp4"] == b"tiny"
+
+def test_migration_moves_bytes_and_keeps_the_video_id(app, s3_storage):
+    async def scenario():
+        file_ids = [(await main.write_video(f"clip{index}.mp4", chunked(DATA[index:]), {"user_id": "u1"}))[0] for index in range(2)]
+        result = await main.storage_migration_job(main.AdminJob(ObjectId()), "s3")
+        file_docs = await app.state.mongodb["fs.files"].find({}).sort("_id", 1).to_list(None)
+        return file_ids, result, file_docs, [await read_range(s3_storage, file_doc, 0, file_doc["length"] - 1) for file_doc in file_docs]
+
+    file_ids, result, file_docs, contents = asyncio.run(scenario())
+    assert result == {"migrated": 2, "failed": 0, "bytes": len(DATA) * 2 - 1}
+    assert [file_doc["_id"] for file_doc in file_docs] == file_ids
+    assert [file_doc["metadata"]["storage"] for file_doc in file_docs] == ["s3", "s3"]
+    assert contents == [DATA, DATA[1:]]
+    assert not list(main._storage_backends["local"].directory.rglob("*.mp4"))
+
+def test_failed_copy_leaves_the_source_readable(app, s3_storage):
+    def refuse(**kwargs):
+        raise RuntimeError("bucket is read-only")
+    s3_storage.client.put_object = refuse
+
+    async def scenario():
+        file_id, _, _ = await main.write_video("clip.mp4", chunked(b"short clip"), {"user_id": "u1"})
+        job = main.AdminJob(ObjectId())
+        result = await main.storage_migration_job(job, "s3")
+        file_doc = await app.state.mongodb["fs.files"].find_one({"_id": file_id})
+        return job, result, file_doc, await read_range(main.storage_for(file_doc), file_doc, 0, file_doc["length"] - 1)
+
+    job, result, file_doc, content = asyncio.run(scenario())
+    assert result == {"migrated": 0, "failed": 1, "bytes": 0}
+    assert "bucket is read-only" in job.errors[0]
+    assert file_doc["metadata"]["storage"] == "local"
+    assert content == b"short clip"
@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+import pytest
+
+import main
+
+@pytest.fixture
+def transcode_app(app, local_storage, monkeypatch):
+    monkeypatch.setattr(main, "MAX_UPLOAD_SIZE", 1024)
+    app.state.transcode_pool = None  # Default executor; ffmpeg is stubbed below
+    return app
+
+def fake_renditions(sizes: dict):
+    """transcode_video_files stand-in writing a file of the given size per rendition"""
+    def transcode_video_files(ffmpeg, input_path, output_dir):
+        result = {"errors": []}
+        for kind, size in sizes.items():
+            path = os.path.join(output_dir, kind)
+            with open(path, "wb") as f:
+                f.write(b"r" * size)
+            result[kind] = path
+        return result
+    return transcode_video_files
+
+async def store_original(size: int):
+    async def chunks():
+        yield b"o" * size
+    file_id, _, _ = await main.write_video("clip.mp4", chunks(), {"user_id": "u1", "content_type": "video/mp4"})
+    await main.app_state.mongodb["fs.files"].update_one({"_id": file_id}, {"$set": {"metadata.transcode_status": "pending"}})
+    return file_id
+
+def test_renditions_may_exceed_the_upload_cap(transcode_app, monkeypatch):
+    monkeypatch.setattr(main, "transcode_video_files", fake_renditions({"preview": 100, "poster": 10, "faststart": 4096}))
+
+    async def scenario():
+        file_id = await store_original(1000)
+        await main.transcode(file_id)
+        return await transcode_app.state.mongodb["fs.files"].find_one({"_id": file_id})
+
+    original = asyncio.run(scenario())
+    assert original["metadata"]["transcode_status"] == "done"
+    assert set(original["metadata"]["renditions"]) == {"preview", "poster", "faststart"}
+
+def test_failed_rendition_keeps_the_others_linked(transcode_app, monkeypatch):
+    monkeypatch.setattr(main, "transcode_video_files", fake_renditions({"preview": 100, "poster": 10, "faststart": 100}))
+    write_video = main.write_video
+
+    async def failing_faststart(filename, chunks, metadata, capped=True):
+        if metadata.get("rendition") == "faststart":
+            raise RuntimeError("disk full")
+        return await write_video(filename, chunks, metadata, capped)
+
+    monkeypatch.setattr(main, "write_video", failing_faststart)
+
+    async def scenario():
+        file_id = await store_original(1000)
+        await main.transcode(file_id)
+        original = await transcode_app.state.mongodb["fs.files"].find_one({"_id": file_id})
+        derived = await transcode_app.state.mongodb["fs.files"].find({"metadata.derived_from": file_id}).to_list(None)
+        return original, derived
+
+    original, derived = asyncio.run(scenario())
+    assert set(original["metadata"]["renditions"]) == {"preview", "poster"}
+    assert any("disk full" in error for error in original["metadata"]["transcode_errors"])
+    assert {str(file_doc["_id"]) for file_doc in derived} == set(original["metadata"]["renditions"].values())
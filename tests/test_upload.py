@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+import httpx
+from bson import ObjectId
+
+import main
+
+BOUNDARY = "emogo-test-boundary"
+
+def multipart_head(user_id: str = "u1") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"user_id\"\r\n\r\n{user_id}\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"clip.mp4\"\r\n"
+        f"Content-Type: video/mp4\r\n\r\n"
+    ).encode()
+
+def multipart_tail() -> bytes:
+    return f"\r\n--{BOUNDARY}--\r\n".encode()
+
+def post(app, content, headers=None):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/upload-video",
+                content=content,
+                headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})}
+            )
+    return asyncio.run(request())
+
+def test_upload_is_stored_and_deduplicated(app, local_storage):
+    body = multipart_head() + b"video-bytes" * 100 + multipart_tail()
+    first = post(app, body)
+    assert first.status_code == 200, first.text
+    assert first.json()["size"] == 1100
+    second = post(app, body)
+    assert second.json()["deduplicated"] is True
+    assert second.json()["video_id"] == first.json()["video_id"]
+    assert len(list(local_storage.rglob("*.mp4"))) == 1
+
+def test_oversized_upload_is_rejected_mid_body(app, local_storage, monkeypatch):
+    monkeypatch.setattr(main, "MAX_UPLOAD_SIZE", 64 * 1024)
+    chunk = b"x" * 16 * 1024
+    total_chunks = 64
+    sent = []
+
+    async def body():
+        yield multipart_head()
+        for _ in range(total_chunks):
+            sent.append(len(chunk))
+            yield chunk
+        yield multipart_tail()
+
+    # A generator body has no Content-Length, so only the streamed size check can stop it
+    response = post(app, body())
+    assert response.status_code == 413
+    assert len(sent) < total_chunks
+    assert not local_storage.exists() or not list(local_storage.rglob("*.mp4"))
+
+def test_declared_oversized_upload_is_rejected_up_front(app, local_storage):
+    response = post(app, b"", headers={"Content-Length": str(main.MAX_UPLOAD_SIZE * 2)})
+    assert response.status_code == 413
+
+def test_missing_user_id_is_rejected(app, local_storage):
+    body = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"clip.mp4\"\r\n\r\n"
+    ).encode() + b"abc" + multipart_tail()
+    assert post(app, body).status_code == 422
+
+def test_upload_session_expires_by_created_at(app):
+    async def scenario():
+        status = await main.create_upload_session(main.UploadSession(user_id="u1"))
+        sessions = app.state.mongodb["upload_sessions"]
+        stored = await sessions.find_one({})
+        expired = datetime.utcnow() - timedelta(hours=main.UPLOAD_SESSION_TTL_HOURS + 1)
+        await sessions.insert_one({"user_id": "u2", "status": "open", "created_at": expired})
+        await main.retention_job(main.AdminJob(ObjectId()))
+        return status, stored, await sessions.find({}, {"user_id": 1}).to_list(None)
+
+    status, stored, remaining = asyncio.run(scenario())
+    assert isinstance(stored["created_at"], datetime)
+    assert [session["user_id"] for session in remaining] == ["u1"]
+    assert status["status"] == "open"
+
+def test_spool_past_memory_threshold_keeps_every_byte():
+    data = bytes(range(256)) * 8192  # 2MB, rolls over to disk
+
+    async def scenario():
+        upload = main.StreamedUpload("clip.mp4", "video/mp4")
+        try:
+            for offset in range(0, len(data), 64 * 1024):
+                await upload.write(data[offset:offset + 64 * 1024])
+            return upload, b"".join([chunk async for chunk in upload.chunks()])
+        finally:
+            upload.close()
+
+    upload, stored = asyncio.run(scenario())
+    assert stored == data
+    assert upload.spool._rolled
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+def test_duplicate_is_per_user_and_counted(app, local_storage):
+    payload = b"same-clip" * 50
+    first = post(app, multipart_head("u1") + payload + multipart_tail()).json()
+    other_user = post(app, multipart_head("u2") + payload + multipart_tail()).json()
+    assert other_user["video_id"] != first["video_id"]
+    assert other_user["deduplicated"] is False
+    retry = post(app, multipart_head("u1") + payload + multipart_tail()).json()
+    assert retry["video_id"] == first["video_id"] and retry["sha256"] == first["sha256"]
+    file_doc = asyncio.run(app.state.mongodb["fs.files"].find_one({"_id": ObjectId(first["video_id"])}))
+    assert file_doc["metadata"]["duplicate_uploads"] == 1
+    assert file_doc["metadata"]["reclaimed_bytes"] == len(payload)
+    assert len(list(local_storage.rglob("*.mp4"))) == 2
+
+def test_resumable_upload_of_stored_bytes_returns_the_existing_video(app, local_storage):
+    payload = b"resumed-clip" * 50
+    stored = post(app, multipart_head() + payload + multipart_tail()).json()
+
+    async def resumable():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            session = (await client.post("/upload-sessions", json={"user_id": "u1", "total_size": len(payload)})).json()
+            await client.put(f"/upload-sessions/{session['session_id']}/chunks/0", content=payload)
+            return await client.post(f"/upload-sessions/{session['session_id']}/finalize")
+
+    response = asyncio.run(resumable())
+    assert response.status_code == 200, response.text
+    assert response.json()["deduplicated"] is True
+    assert response.json()["video_id"] == stored["video_id"]
+    assert len(list(local_storage.rglob("*.mp4"))) == 1
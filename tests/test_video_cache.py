@@ -0,0 +1,38 @@
+import os
+
+import main
+
+def test_load_takes_over_a_dead_workers_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "process_alive", lambda pid: pid == os.getpid())
+    dead = tmp_path / "999999"
+    dead.mkdir()
+    (dead / "abc.mp4").write_bytes(b"x" * 10)
+    (dead / "abc.json").write_text("{}")
+    (dead / "def.part").write_bytes(b"partial")
+    (tmp_path / "legacy.mp4").write_bytes(b"shared layout")
+
+    cache = main.VideoCache(tmp_path, 1024)
+    cache.load()
+
+    assert cache.directory == tmp_path / str(os.getpid())
+    assert sorted(path.name for path in tmp_path.iterdir()) == [str(os.getpid())]
+    assert sorted(path.name for path in cache.directory.iterdir()) == ["abc.json", "abc.mp4"]
+    assert cache.size == 10
+
+def test_evict_reaches_other_workers_directories(tmp_path):
+    other = tmp_path / "1"
+    other.mkdir()
+    (other / "abc.mp4").write_bytes(b"x")
+    (other / "abc.json").write_text("{}")
+    cache = main.VideoCache(tmp_path, 1024)
+
+    cache.evict("abc")
+
+    assert list(other.iterdir()) == []
+
+def test_metrics_series_carry_the_worker_pid():
+    registry = main.Metrics()
+    registry.register("counter", "requests_total", "Requests", ("route",))
+    registry.inc("requests_total", route="/gps")
+
+    assert f'requests_total{{pid="{os.getpid()}",route="/gps"}} 1' in registry.render()
@@ -0,0 +1,21 @@
+from main import clean_vlog_video
+
+VIDEO_ID = "65f1c0ffee0123456789abcd"
+
+def test_local_file_url_is_dropped():
+    vlog = clean_vlog_video({"user_id": "u1", "video_url": "file:///data/user/0/clip.mp4"})
+    assert vlog["video_url"] is None
+    assert vlog["video_id"] is None
+
+def test_video_id_is_taken_from_a_download_url():
+    vlog = clean_vlog_video({"video_url": f" https://emogo.example/download-video/{VIDEO_ID} "})
+    assert vlog["video_url"] == f"https://emogo.example/download-video/{VIDEO_ID}"
+    assert vlog["video_id"] == VIDEO_ID
+
+def test_valid_video_id_is_kept():
+    vlog = clean_vlog_video({"video_id": VIDEO_ID, "video_url": "https://cdn.example/clip.mp4"})
+    assert vlog["video_id"] == VIDEO_ID
+
+def test_invalid_video_id_without_reference_is_cleared():
+    vlog = clean_vlog_video({"video_id": "not-an-id", "video_url": "https://cdn.example/clip.mp4"})
+    assert vlog["video_id"] is None
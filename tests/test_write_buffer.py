@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+import main
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_flush_ack_writes_before_returning(app):
+    async def scenario():
+        write_buffer = main.WriteBuffer("gps", max_docs=2, max_delay=10)
+        first = asyncio.create_task(write_buffer.insert({"user_id": "a"}))
+        second = asyncio.create_task(write_buffer.insert({"user_id": "b"}))
+        ids = await asyncio.gather(first, second)
+        # max_docs reached: flushed without waiting for the delay
+        stored = await app.state.mongodb["gps"].find().to_list(None)
+        return ids, stored
+
+    ids, stored = run(scenario())
+    assert all(isinstance(inserted_id, ObjectId) for inserted_id in ids)
+    assert sorted(document["_id"] for document in stored) == sorted(ids)
+
+def test_enqueue_ack_stores_objectid_even_if_caller_mutates(app):
+    async def scenario():
+        write_buffer = main.WriteBuffer("gps", max_docs=100, max_delay=0.01)
+        document = {"user_id": "a"}
+        inserted_id = await write_buffer.insert(document, wait=False)
+        assert await app.state.mongodb["gps"].count_documents({}) == 0  # Not written yet
+        document["_id"] = str(inserted_id)  # What the endpoints do to build their response
+        await write_buffer.drain()
+        stored = await app.state.mongodb["gps"].find_one({})
+        return inserted_id, stored
+
+    inserted_id, stored = run(scenario())
+    assert stored["_id"] == inserted_id
+    assert isinstance(stored["_id"], ObjectId)
+
+def test_enqueue_ack_documents_are_visible_to_keyset_paging(app, monkeypatch):
+    monkeypatch.setattr(main, "WRITE_BUFFER_ACK", "enqueue")
+
+    async def scenario():
+        app.state.write_buffers = {"gps": main.WriteBuffer("gps", max_docs=100, max_delay=0.01)}
+        response_data = {"user_id": "a", "latitude": 1.0, "longitude": 2.0}
+        inserted_id = await main.buffered_insert("gps", response_data)
+        response_data["_id"] = str(inserted_id)
+        await app.state.write_buffers["gps"].drain()
+        params = {"limit": 10, "after": "0" * 24, "user_id": None, "since": None, "until": None, "fields": None}
+        return await main.find_page("gps", params)
+
+    documents, _ = run(scenario())
+    assert len(documents) == 1
+
+class FailingCollection:
+    async def insert_many(self, documents, ordered=True):
+        raise RuntimeError("cluster unavailable")
+
+def test_failed_flush_raises_for_waiting_callers(app):
+    app.state.mongodb = {"gps": FailingCollection()}
+
+    async def scenario():
+        write_buffer = main.WriteBuffer("gps", max_docs=1, max_delay=10)
+        await write_buffer.insert({"user_id": "a"})
+
+    with pytest.raises(RuntimeError, match="cluster unavailable"):
+        run(scenario())